@@ -14,23 +14,35 @@ import pytest
 from PIL import Image, ImageChops, ImageStat
 
 # Import our converter
-from eps_to_png import parse_eps_file, convert_eps_to_png
+from eps_to_png import parse_eps_file, convert_eps_to_png, SimplePostScriptInterpreter
 
 class TestEPSToPNG(unittest.TestCase):
     """Test suite for the EPS to PNG converter."""
     
-    def setUp(self):
-        """Set up test environment."""
-        self.test_files = [
-            "test_square.eps",
-            "test_shapes.eps",
-            "test_circles.eps"
-        ]
-        self.temp_dir = tempfile.TemporaryDirectory()
+    test_files = [
+        "test_square.eps",
+        "test_shapes.eps",
+        "test_circles.eps"
+    ]
     
-    def tearDown(self):
+    @classmethod
+    def setUpClass(cls):
+        """Set up test environment shared by all tests."""
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls._converted = {}
+    
+    @classmethod
+    def tearDownClass(cls):
         """Clean up after tests."""
-        self.temp_dir.cleanup()
+        cls.temp_dir.cleanup()
+    
+    def _convert(self, eps_path):
+        """Convert an EPS file to PNG, reusing an earlier conversion if any."""
+        if eps_path not in self._converted:
+            png_path = Path(self.temp_dir.name) / f"{eps_path.stem}.png"
+            convert_eps_to_png(eps_path, png_path)
+            self._converted[eps_path] = png_path
+        return self._converted[eps_path]
     
     def test_parse_eps_file(self):
         """Test EPS file parsing."""
@@ -56,6 +68,41 @@ class TestEPSToPNG(unittest.TestCase):
                 self.assertTrue(any(cmd in all_commands for cmd in drawing_commands), 
                               f"No drawing commands found in {test_file}")
     
+    def test_parse_eps_file_atend_and_whitespace(self):
+        """Test (atend) bounding boxes and whitespace around command lines."""
+        eps_path = Path(self.temp_dir.name) / "atend.eps"
+        eps_path.write_text(
+            "%!PS-Adobe-3.0 EPSF-3.0\n"
+            "%%BoundingBox: (atend)\n"
+            "  newpath 1 1 moveto  \n"
+            "\t5 5 lineto\tstroke\n"
+            "  % indented comment\n"
+            "%%Trailer\n"
+            "%%BoundingBox: 0 0 10 20\n"
+        )
+        
+        bbox, commands = parse_eps_file(eps_path)
+        
+        self.assertEqual(bbox, [0, 0, 10, 20])
+        self.assertEqual(commands, ["newpath 1 1 moveto", "5 5 lineto\tstroke"])
+    
+    def test_number_like_tokens_are_ignored(self):
+        """Test that tokens float() accepts but the interpreter doesn't are ignored."""
+        def run(token):
+            interpreter = SimplePostScriptInterpreter(10, 10, [0, 0, 10, 10])
+            bitmap = interpreter.execute([f"newpath 1 1 moveto {token} 8 8 lineto stroke"])
+            return bitmap.pixels, interpreter.stack
+        
+        # An unknown name is skipped without touching the stack
+        expected_pixels, expected_stack = run("unknown")
+        self.assertEqual(expected_stack, [])
+        
+        for token in ["-inf", "-nan", "1e2", "1_0", "5-"]:
+            with self.subTest(token=token):
+                pixels, stack = run(token)
+                self.assertEqual(stack, expected_stack)
+                self.assertEqual(pixels, expected_pixels)
+    
     def test_eps_conversion_dimensions(self):
         """Test that the generated PNGs have correct dimensions."""
         for test_file in self.test_files:
@@ -67,8 +114,7 @@ class TestEPSToPNG(unittest.TestCase):
                 expected_height = bbox[3] - bbox[1]
                 
                 # Convert EPS to PNG
-                png_path = Path(self.temp_dir.name) / f"{eps_path.stem}.png"
-                convert_eps_to_png(eps_path, png_path)
+                png_path = self._convert(eps_path)
                 
                 # Check that the PNG file exists
                 self.assertTrue(png_path.exists())
@@ -84,8 +130,7 @@ class TestEPSToPNG(unittest.TestCase):
             eps_path = Path(test_file)
             if eps_path.exists():
                 # Convert EPS to PNG
-                png_path = Path(self.temp_dir.name) / f"{eps_path.stem}.png"
-                convert_eps_to_png(eps_path, png_path)
+                png_path = self._convert(eps_path)
                 
                 # Validate PNG using PIL
                 try:
@@ -106,8 +151,7 @@ class TestEPSToPNG(unittest.TestCase):
             eps_path = Path(test_file)
             if eps_path.exists():
                 # Our converter output
-                our_png_path = Path(self.temp_dir.name) / f"{eps_path.stem}_our.png"
-                convert_eps_to_png(eps_path, our_png_path)
+                our_png_path = self._convert(eps_path)
                 
                 # Check if Ghostscript command-line tool is available
                 try:
@@ -176,8 +220,7 @@ class TestEPSToPNG(unittest.TestCase):
             eps_path = Path(test_file)
             if eps_path.exists():
                 # Our converter output
-                our_png_path = Path(self.temp_dir.name) / f"{eps_path.stem}_our.png"
-                convert_eps_to_png(eps_path, our_png_path)
+                our_png_path = self._convert(eps_path)
                 
                 # Check if Ghostscript command-line tool is available
                 try:
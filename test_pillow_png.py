@@ -4,16 +4,17 @@ Test script to generate PNG files using Pillow for comparison.
 """
 import sys
 from PIL import Image
-import numpy as np
 from eps_to_png import parse_eps_file, SimplePostScriptInterpreter
 
-def convert_eps_to_png_pillow(eps_file, png_file):
+def convert_eps_to_png_pillow(eps_file, png_file, compress_level=1):
     """
     Convert an EPS file to a PNG file using Pillow for the PNG encoding.
     
     Args:
         eps_file: Path to the EPS file
         png_file: Path to the output PNG file
+        compress_level: zlib level for Pillow's encoder, 0-9 (defaults to 1,
+            the fastest level that still compresses)
     """
     # Parse EPS file
     bbox, commands = parse_eps_file(eps_file)
@@ -26,14 +27,12 @@ def convert_eps_to_png_pillow(eps_file, png_file):
     interpreter = SimplePostScriptInterpreter(width, height, bbox)
     bitmap = interpreter.execute(commands)
     
-    # Convert bitmap to numpy array
-    array = np.array(bitmap.pixels, dtype=np.uint8)
-    
-    # Create PIL Image from array
-    img = Image.fromarray(array, mode='L')
+    # Wrap the bitmap's row-major pixel buffer in a PIL Image; with these
+    # raw decoder arguments Pillow shares the buffer instead of copying it
+    img = Image.frombuffer('L', (width, height), bitmap.pixels, 'raw', 'L', 0, 1)
     
     # Save as PNG
-    img.save(png_file)
+    img.save(png_file, optimize=False, compress_level=compress_level)
     
     print(f"Converted {eps_file} to {png_file} using Pillow")
     print(f"Dimensions: {width}x{height} pixels")